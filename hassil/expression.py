@@ -1,8 +1,22 @@
 """Classes for representing sentence templates."""
+import re
+import sys
 from abc import ABC
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from functools import cached_property
+from typing import FrozenSet, List, Optional, Pattern, Set
+
+from .util import PUNCTUATION_CHARS, remove_punctuation_and_whitespace
+
+# Regex for text matched by a list or rule reference
+_ANY_TEXT = ".*?"
+
+# More wildcards than this could make a filter regex backtrack heavily
+_MAX_REGEX_WILDCARDS = 2
+
+# Punctuation is treated like whitespace when splitting text into words
+_PUNCTUATION = re.compile(rf"[{re.escape(PUNCTUATION_CHARS)}]")
 
 
 @dataclass
@@ -17,6 +31,27 @@ class TextChunk(Expression):
     # Text representation expression
     text: str = ""
 
+    # Text without leading whitespace
+    stripped_text: str = field(default="", init=False, repr=False, compare=False)
+
+    # Text with all whitespace removed
+    text_without_whitespace: str = field(
+        default="", init=False, repr=False, compare=False
+    )
+
+    # True if text ends with a space
+    ends_with_space: bool = field(default=False, init=False, repr=False, compare=False)
+
+    # True if text is only whitespace (and not empty)
+    is_whitespace: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Computed once here since chunks are matched many times
+        self.stripped_text = self.text.lstrip()
+        self.text_without_whitespace = "".join(self.text.split())
+        self.ends_with_space = self.text.endswith(" ")
+        self.is_whitespace = self.text.isspace()
+
     @property
     def is_empty(self) -> bool:
         """True if the chunk is empty"""
@@ -73,6 +108,10 @@ class ListReference(Expression):
         else:
             self._slot_name = self.list_name
 
+        # Names are used for lookups during matching
+        self.list_name = sys.intern(self.list_name)
+        self._slot_name = sys.intern(self._slot_name)
+
     @property
     def slot_name(self) -> str:
         """Name of slot to put list value into."""
@@ -85,3 +124,272 @@ class Sentence(Sequence):
     """Sequence representing a complete sentence template."""
 
     text: Optional[str] = None
+
+    @cached_property
+    def filter_pattern(self) -> Optional[Pattern[str]]:
+        """
+        Regex that input text must fully match for this sentence to match.
+
+        Both the regex and input text have punctuation and whitespace removed.
+        Lists and rules may match any text, so this is a necessary but not a
+        sufficient condition. None if the sentence may match any text.
+
+        Also None if lists/rules leave more than two wildcards, since the
+        regex could then backtrack heavily on input that doesn't match. See
+        filter_segments for those sentences.
+        """
+        regex = _filter_regex(self)
+
+        # re.escape() escapes ".", "*", and "?" so only wildcards are counted
+        if (regex == _ANY_TEXT) or (regex.count(_ANY_TEXT) > _MAX_REGEX_WILDCARDS):
+            return None
+
+        return re.compile(regex)
+
+    @cached_property
+    def filter_segments(self) -> Optional[List[str]]:
+        """
+        Literal text that input text must contain in order, with anything in
+        between (from lists/rules). The first and last segments must be at
+        the start and end of the text.
+
+        Used instead of filter_pattern for sentences with more than two
+        wildcards. Alternatives are treated as wildcards unless all of their
+        items have the same text. Checking segments is linear in the length
+        of the input text.
+        """
+        if self.filter_pattern is not None:
+            return None
+
+        segments = _filter_segments(self)
+        if len(segments) < 3:
+            # Any text
+            return None
+
+        return segments
+
+    def is_possible_match(self, filter_text: str) -> bool:
+        """
+        False if text with punctuation and whitespace removed can't match.
+
+        True does not mean the sentence will match.
+        """
+        filter_pattern = self.filter_pattern
+        if filter_pattern is not None:
+            return filter_pattern.fullmatch(filter_text) is not None
+
+        segments = self.filter_segments
+        if segments is None:
+            return True
+
+        # First and last segments must not overlap
+        start_index = len(segments[0])
+        end_index = len(filter_text) - len(segments[-1])
+        if (
+            (end_index < start_index)
+            or (not filter_text.startswith(segments[0]))
+            or (not filter_text.endswith(segments[-1]))
+        ):
+            return False
+
+        # Leftmost match of each segment leaves the most room for the rest
+        for segment in segments[1:-1]:
+            segment_index = filter_text.find(segment, start_index, end_index)
+            if segment_index < 0:
+                return False
+
+            start_index = segment_index + len(segment)
+
+        return True
+
+    @cached_property
+    def required_words(self) -> FrozenSet[str]:
+        """
+        Words that must be present in input text for this sentence to match.
+
+        Only whole words from text chunks that are part of every possible path
+        through the sentence are included. Input words are split on whitespace
+        after replacing punctuation with spaces.
+        """
+        return frozenset(_required_words(self, True, True))
+
+    @cached_property
+    def literal_text(self) -> Optional[str]:
+        """
+        Text of the sentence if it only contains text chunks, otherwise None.
+
+        Input text that is exactly the literal text always matches, and has
+        no entities.
+        """
+        chunk_texts: List[str] = []
+        if not _collect_literal_text(self, chunk_texts):
+            return None
+
+        return "".join(chunk_texts)
+
+    @cached_property
+    def literal_prefix(self) -> str:
+        """
+        Text that input must start with for this sentence to match.
+
+        Punctuation and whitespace are removed, like filter_pattern.
+        Empty if the sentence starts with an alternative, list, or rule.
+        """
+        chunk_texts: List[str] = []
+
+        # Stops at the first item that isn't text
+        _collect_literal_text(self, chunk_texts)
+
+        return remove_punctuation_and_whitespace("".join(chunk_texts))
+
+
+def _collect_literal_text(expression: Expression, chunk_texts: List[str]) -> bool:
+    """Add text of chunks in a group to chunk_texts. False if not only text."""
+    if isinstance(expression, TextChunk):
+        chunk_texts.append(expression.text)
+        return True
+
+    if isinstance(expression, Sequence) and (expression.type == SequenceType.GROUP):
+        return all(
+            _collect_literal_text(item, chunk_texts) for item in expression.items
+        )
+
+    # Alternative, {list}, or <rule>
+    return False
+
+
+def _required_words(
+    expression: Expression, start_boundary: bool, end_boundary: bool
+) -> Set[str]:
+    """
+    Collect words that must be matched by an expression.
+
+    The boundary flags are True if the expression is known to start or end on
+    a word boundary in the input (e.g., start/end of sentence).
+    """
+    if isinstance(expression, TextChunk):
+        chunk_text = _PUNCTUATION.sub(" ", expression.text)
+        words = chunk_text.split()
+        if not words:
+            return set()
+
+        # First/last word may be part of a larger word in the input
+        start_index = 0 if start_boundary else 1
+        end_index = len(words)
+        if not (end_boundary or chunk_text[-1].isspace()):
+            end_index -= 1
+
+        return set(words[start_index:end_index])
+
+    if isinstance(expression, Sequence):
+        if expression.type == SequenceType.ALTERNATIVE:
+            if not expression.items:
+                return set()
+
+            # Words must be in every alternative
+            item_words = [
+                _required_words(item, start_boundary, end_boundary)
+                for item in expression.items
+            ]
+            return set.intersection(*item_words)
+
+        group_words: Set[str] = set()
+        last_index = len(expression.items) - 1
+        for item_index, item in enumerate(expression.items):
+            group_words.update(
+                _required_words(
+                    item, start_boundary, end_boundary and (item_index == last_index)
+                )
+            )
+
+            # Only literal whitespace is guaranteed to separate words.
+            # Whitespace may be skipped after lists, rules, and optionals.
+            start_boundary = isinstance(item, TextChunk) and _ends_with_boundary(item)
+
+        return group_words
+
+    # {list} or <rule>
+    return set()
+
+
+def _ends_with_boundary(chunk: TextChunk) -> bool:
+    """True if a chunk must be followed by a word boundary when matched."""
+    chunk_text = _PUNCTUATION.sub(" ", chunk.text)
+    return bool(chunk_text.strip()) and chunk_text[-1].isspace()
+
+
+def _filter_segments(expression: Expression) -> List[str]:
+    """
+    Split an expression into literal text separated by wildcards, like
+    _filter_regex. Alternatives with different text in their items are
+    wildcards.
+    """
+    if isinstance(expression, TextChunk):
+        return [remove_punctuation_and_whitespace(expression.text)]
+
+    if isinstance(expression, Sequence):
+        item_segments = [_filter_segments(item) for item in expression.items]
+
+        if expression.type == SequenceType.ALTERNATIVE:
+            if (not item_segments) or any(
+                segments != item_segments[0] for segments in item_segments
+            ):
+                # Any text
+                return ["", ""]
+
+            return item_segments[0]
+
+        group_segments = [""]
+        for segments in item_segments:
+            group_segments[-1] += segments[0]
+            group_segments.extend(segments[1:])
+
+        if len(group_segments) > 2:
+            # Repeated wildcards are the same as one
+            group_segments = (
+                group_segments[:1]
+                + [segment for segment in group_segments[1:-1] if segment]
+                + group_segments[-1:]
+            )
+
+        return group_segments
+
+    # {list} or <rule>
+    return ["", ""]
+
+
+def _filter_regex(expression: Expression) -> str:
+    """Lower an expression to a regex over text without punctuation/whitespace."""
+    if isinstance(expression, TextChunk):
+        return re.escape(remove_punctuation_and_whitespace(expression.text))
+
+    if isinstance(expression, Sequence):
+        item_regexes = [_filter_regex(item) for item in expression.items]
+
+        if expression.type == SequenceType.ALTERNATIVE:
+            if _ANY_TEXT in item_regexes:
+                return _ANY_TEXT
+
+            # Remove duplicates, keeping order
+            item_regexes = list(dict.fromkeys(item_regexes))
+            if len(item_regexes) == 1:
+                return item_regexes[0]
+
+            return "(?:" + "|".join(item_regexes) + ")"
+
+        group_regexes: List[str] = []
+        for item_regex in item_regexes:
+            if (not item_regex) or (
+                (item_regex == _ANY_TEXT)
+                and group_regexes
+                and (group_regexes[-1] == _ANY_TEXT)
+            ):
+                # Skip empty text and repeated wildcards
+                continue
+
+            group_regexes.append(item_regex)
+
+        return "".join(group_regexes)
+
+    # {list} or <rule>
+    return _ANY_TEXT
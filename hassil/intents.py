@@ -4,14 +4,19 @@ from abc import ABC
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import cached_property
+from operator import itemgetter
 from pathlib import Path
-from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from typing import IO, Any, Dict, Iterable, List, Optional, Pattern, Tuple, Union, cast
 
 from yaml import safe_load
 
 from .expression import Expression, Sentence, TextChunk
 from .parse_expression import parse_sentence
-from .util import is_template, merge_dict, normalize_text
+from .util import compile_skip_words, is_template, merge_dict, normalize_text
+
+# Key in a trie node for the values (or sentences) that end there.
+# Never collides with a single character key.
+_TRIE_VALUES = ""
 
 
 class ResponseType(str, Enum):
@@ -121,6 +126,96 @@ class TextSlotList(SlotList):
 
     values: List[TextSlotValue]
 
+    _trie: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _trie_values: Optional[List[TextSlotValue]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _template_indexes: List[int] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    @property
+    def template_indexes(self) -> List[int]:
+        """Indexes of values that can't be matched with find_prefixes."""
+        self._ensure_trie()
+        return self._template_indexes
+
+    def find_prefixes(self, text: str, start_index: int = 0) -> List[Tuple[int, int]]:
+        """
+        Find values whose input text is a prefix of text[start_index:].
+
+        Returns (value index, end index in text) for each matching value.
+        Only plain text values are matched (see template_indexes).
+        """
+        node = self._ensure_trie()
+        prefixes: List[Tuple[int, int]] = []
+        for text_index in range(start_index, len(text)):
+            maybe_node = node.get(text[text_index])
+            if maybe_node is None:
+                break
+
+            node = maybe_node
+            value_indexes = node.get(_TRIE_VALUES)
+            if value_indexes:
+                prefixes.extend(
+                    (value_index, text_index + 1) for value_index in value_indexes
+                )
+
+        return prefixes
+
+    def invalidate(self) -> None:
+        """
+        Rebuild the trie on next use.
+
+        Only needed if a value is modified in place. Changes to the values
+        list itself are detected automatically.
+        """
+        self._trie_values = None
+
+    def _ensure_trie(self) -> Dict[str, Any]:
+        """Build character trie over plain text values (rebuilt if values change)."""
+        # Values are compared by identity first, so this is cheap when the
+        # list hasn't changed.
+        if (
+            (self._trie is not None)
+            and (self._trie_values is not None)
+            and (self._trie_values == self.values)
+        ):
+            return self._trie
+
+        # Copy before building so later changes are always detected
+        values = list(self.values)
+
+        trie: Dict[str, Any] = {}
+        template_indexes: List[int] = []
+
+        for value_index, value in enumerate(values):
+            text_in = value.text_in
+            if (
+                (not isinstance(text_in, TextChunk))
+                or (not text_in.text.strip())
+                or text_in.text[0].isspace()
+            ):
+                # Templates, empty, and whitespace-prefixed values are matched
+                # with the full expression matcher.
+                template_indexes.append(value_index)
+                continue
+
+            node = trie
+            for c in text_in.text:
+                node = node.setdefault(c, {})
+
+            node.setdefault(_TRIE_VALUES, []).append(value_index)
+
+        # Values are set last so other threads never see a partially built trie
+        self._trie = trie
+        self._template_indexes = template_indexes
+        self._trie_values = values
+
+        return trie
+
     @staticmethod
     def from_strings(
         strings: Iterable[str],
@@ -187,6 +282,120 @@ class Intents:
     settings: IntentsSettings = field(default_factory=IntentsSettings)
     """Settings that may change recognition."""
 
+    _skip_words_patterns: Optional[List[Pattern[str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _skip_words_key: Optional[List[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _sentence_trie: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _sentence_trie_key: Optional[
+        Tuple[Dict[str, Intent], List[List[IntentData]], List[List[Sentence]]]
+    ] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def skip_words_patterns(self) -> List[Pattern[str]]:
+        """Regexes matching skip words, longest first (recompiled if skip words change)."""
+        if not self.skip_words:
+            return []
+
+        if (self._skip_words_patterns is None) or (
+            self._skip_words_key != self.skip_words
+        ):
+            self._skip_words_patterns = compile_skip_words(self.skip_words)
+            self._skip_words_key = list(self.skip_words)
+
+        return self._skip_words_patterns
+
+    def find_sentences(self, text: str) -> List[Tuple[Intent, IntentData, Sentence]]:
+        """
+        Find sentences whose literal prefix is a prefix of text, which must have
+        punctuation and whitespace removed.
+
+        Sentences are returned in the same order as the intents.
+        All sentences are put into a trie by literal prefix, which is rebuilt
+        if intents or sentences change.
+        """
+        node: Optional[Dict[str, Any]] = self._ensure_sentence_trie()
+        sentences: List[Tuple[int, Intent, IntentData, Sentence]] = []
+        text_index = 0
+        while node is not None:
+            prefix_sentences = node.get(_TRIE_VALUES)
+            if prefix_sentences:
+                sentences.extend(prefix_sentences)
+
+            if text_index >= len(text):
+                break
+
+            node = node.get(text[text_index])
+            text_index += 1
+
+        # Restore the original order
+        sentences.sort(key=itemgetter(0))
+
+        return [
+            (intent, intent_data, sentence)
+            for _index, intent, intent_data, sentence in sentences
+        ]
+
+    def _ensure_sentence_trie(self) -> Dict[str, Any]:
+        """Build character trie over literal prefixes of all sentences."""
+        if (self._sentence_trie is not None) and (not self._sentence_trie_changed()):
+            return self._sentence_trie
+
+        # Shallow copies, so changes made in place are noticed
+        intents = dict(self.intents)
+        intent_datas = [list(intent.data) for intent in intents.values()]
+        intent_sentences = [
+            list(intent_data.sentences)
+            for intent_data_list in intent_datas
+            for intent_data in intent_data_list
+        ]
+
+        trie: Dict[str, Any] = {}
+        sentence_index = 0
+        sentences_iter = iter(intent_sentences)
+        for intent, intent_data_list in zip(intents.values(), intent_datas):
+            for intent_data in intent_data_list:
+                for sentence in next(sentences_iter):
+                    node = trie
+                    for c in sentence.literal_prefix:
+                        node = node.setdefault(c, {})
+
+                    node.setdefault(_TRIE_VALUES, []).append(
+                        (sentence_index, intent, intent_data, sentence)
+                    )
+                    sentence_index += 1
+
+        # Key is set last so other threads never see a partially built trie
+        self._sentence_trie = trie
+        self._sentence_trie_key = (intents, intent_datas, intent_sentences)
+
+        return trie
+
+    def _sentence_trie_changed(self) -> bool:
+        """True if intents or sentences changed since the sentence trie was built."""
+        key = self._sentence_trie_key
+        if key is None:
+            return True
+
+        # Items are compared by identity first, so this is cheap when nothing changed
+        key_intents, key_intent_datas, key_sentences = key
+        return (
+            (self.intents != key_intents)
+            or ([intent.data for intent in self.intents.values()] != key_intent_datas)
+            or (
+                [
+                    intent_data.sentences
+                    for intent in self.intents.values()
+                    for intent_data in intent.data
+                ]
+                != key_sentences
+            )
+        )
+
     @staticmethod
     def from_files(file_paths: Iterable[Union[str, Path]]) -> "Intents":
         """Load intents from YAML file paths."""
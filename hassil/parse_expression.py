@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass
 from typing import Optional
 
@@ -71,8 +72,8 @@ def parse_group_or_alt(
     else:
         raise ParseExpressionError(seq_chunk, metadata=metadata)
 
-    item_chunk = next_chunk(seq_text)
-    last_seq_text = seq_text
+    seq_index = 0
+    item_chunk = next_chunk(seq_text, seq_index)
 
     while item_chunk is not None:
         if item_chunk.parse_type in (
@@ -107,14 +108,12 @@ def parse_group_or_alt(
             raise ParseExpressionError(seq_chunk, metadata=metadata)
 
         # Next chunk
-        seq_text = seq_text[item_chunk.end_index :]
-
-        if seq_text == last_seq_text:
+        if item_chunk.end_index <= seq_index:
             # No change, unable to proceed
             raise ParseExpressionError(seq_chunk, metadata=metadata)
 
-        item_chunk = next_chunk(seq_text)
-        last_seq_text = seq_text
+        seq_index = item_chunk.end_index
+        item_chunk = next_chunk(seq_text, seq_index)
 
     return seq
 
@@ -123,7 +122,8 @@ def parse_expression(
     chunk: ParseChunk, metadata: Optional[ParseMetadata] = None
 ) -> Expression:
     if chunk.parse_type == ParseType.WORD:
-        return TextChunk(text=normalize_text(chunk.text))
+        # Interned since the same words appear in many sentences
+        return TextChunk(text=sys.intern(normalize_text(chunk.text)))
 
     if chunk.parse_type == ParseType.GROUP:
         return parse_group_or_alt(chunk, metadata=metadata)
@@ -146,7 +146,7 @@ def parse_expression(
             RULE_END,
         )
 
-        return RuleReference(rule_name=rule_name)
+        return RuleReference(rule_name=sys.intern(rule_name))
 
     raise ParseExpressionError(chunk, metadata=metadata)
 
@@ -52,12 +52,10 @@ def find_end_delimiter(
     text: str, start_index: int, start_char: str, end_char: str
 ) -> Optional[int]:
     """Finds the index of an ending delimiter."""
-    if start_index > 0:
-        text = text[start_index:]
-
     stack = 1
     is_escaped = False
-    for i, c in enumerate(text):
+    for i in range(start_index, len(text)):
+        c = text[i]
         if is_escaped:
             is_escaped = False
             continue
@@ -72,7 +70,7 @@ def find_end_delimiter(
                 return None
 
             if stack == 0:
-                return start_index + i + 1
+                return i + 1
 
         if c == start_char:
             stack += 1
@@ -82,12 +80,10 @@ def find_end_delimiter(
 
 def find_end_word(text: str, start_index: int) -> Optional[int]:
     """Finds the end index of a word."""
-    if start_index > 0:
-        text = text[start_index:]
-
     is_escaped = False
     separator_found = False
-    for i, c in enumerate(text):
+    for i in range(start_index, len(text)):
+        c = text[i]
         if is_escaped:
             is_escaped = False
             continue
@@ -96,20 +92,20 @@ def find_end_word(text: str, start_index: int) -> Optional[int]:
             is_escaped = True
             continue
 
-        if (i > 0) and (c == WORD_SEP):
+        if (i > start_index) and (c == WORD_SEP):
             separator_found = True
             continue
 
         if separator_found and (c != WORD_SEP):
             # Start of next word
-            return start_index + i
+            return i
 
         if (c == ALT_SEP) or (c in DELIM_START) or (c in DELIM_END):
-            return start_index + i
+            return i
 
-    if text:
-        # Entire text is a word
-        return start_index + len(text)
+    if start_index < len(text):
+        # Rest of text is a word
+        return len(text)
 
     return None
 
@@ -144,14 +140,12 @@ class ParseError(Exception):
 
 def skip_text(text: str, start_index: int, skip: str) -> int:
     """Skips a string in text, taking escapes into account."""
-    if start_index > 0:
-        text = text[start_index:]
-
-    if not text:
+    if start_index >= len(text):
         raise ParseError(f"Cannot skip '{skip}' in empty text")
 
-    text_index = 0
-    for c_text in text:
+    text_index = start_index
+    while text_index < len(text):
+        c_text = text[text_index]
         if c_text == ESCAPE_CHAR:
             text_index += 1
             continue
@@ -166,9 +160,9 @@ def skip_text(text: str, start_index: int, skip: str) -> int:
             break
 
     if skip:
-        raise ParseError(f"Failed to skip '{skip}' in: {text}")
+        raise ParseError(f"Failed to skip '{skip}' in: {text[start_index:]}")
 
-    return start_index + text_index
+    return text_index
 
 
 def next_chunk(text: str, start_index: int = 0) -> Optional[ParseChunk]:
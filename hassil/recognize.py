@@ -3,8 +3,25 @@
 import collections.abc
 import itertools
 import re
-from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+import sys
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from .expression import (
     Expression,
@@ -15,12 +32,36 @@ from .expression import (
     SequenceType,
     TextChunk,
 )
-from .intents import Intent, Intents, RangeSlotList, SlotList, TextSlotList
-from .util import normalize_text, normalize_whitespace
+from .intents import (
+    Intent,
+    IntentData,
+    Intents,
+    RangeSlotList,
+    SlotList,
+    TextSlotList,
+    TextSlotValue,
+)
+from .util import (
+    PUNCTUATION_CHARS,
+    compile_skip_words,
+    normalize_text,
+    normalize_whitespace,
+    remove_punctuation_and_whitespace,
+)
 
-NUMBER_START = re.compile(r"^(\s*-?[0-9]+)")
-PUNCTUATION = re.compile(r"[.。,，?¿？!！;；:：]+")
+NUMBER_START = re.compile(r"(\s*-?[0-9]+)")
+FIRST_WORD = re.compile(r"\s*(\S+)")
+PUNCTUATION = re.compile(rf"[{re.escape(PUNCTUATION_CHARS)}]+")
 WHITESPACE = re.compile(r"\s+")
+_REMOVE_PUNCTUATION = str.maketrans("", "", PUNCTUATION_CHARS)
+
+# Remaining items of groups being matched: (items, next item index, outer)
+_Continuation = Tuple[List[Expression], int, Any]
+
+# Matching creates many small objects, so use __slots__ where available
+_DATACLASS_SLOTS: Dict[str, Any] = (
+    {"slots": True} if sys.version_info >= (3, 10) else {}
+)
 
 
 class HassilError(Exception):
@@ -35,7 +76,7 @@ class MissingRuleError(HassilError):
     """Error when an <expansion_rule> is missing."""
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class MatchEntity:
     """Named entity that has been matched from a {slot_list}"""
 
@@ -62,16 +103,47 @@ class MatchSettings:
     ignore_whitespace: bool = False
     """True if whitespace should be ignored during matching."""
 
+    match_cache: Dict[Any, List["MatchContext"]] = field(default_factory=dict)
+    """Results of list/rule references by input context (valid for one call)."""
 
-@dataclass
+    punctuation_cache: Dict[str, Tuple[str, List[int]]] = field(default_factory=dict)
+    """Text with punctuation replaced and offset map by input text (valid for one call)."""
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class EntityChain:
+    """Immutable linked list of matched entities, shared between contexts."""
+
+    entity: MatchEntity
+    """Most recently matched entity."""
+
+    previous: Optional["EntityChain"] = None
+    """Entities matched before this one."""
+
+    def to_list(self) -> List[MatchEntity]:
+        """Entities in the order they were matched."""
+        entities: List[MatchEntity] = []
+        chain: Optional[EntityChain] = self
+        while chain is not None:
+            entities.append(chain.entity)
+            chain = chain.previous
+
+        entities.reverse()
+        return entities
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class MatchContext:
     """Context passed to match_expression."""
 
-    text: str
-    """Input text remaining to be processed."""
+    full_text: str
+    """Input text being processed."""
+
+    offset: int = 0
+    """Index in full_text where the remaining text starts."""
 
-    entities: List[MatchEntity] = field(default_factory=list)
-    """Entities that have been found in input text."""
+    entity_chain: Optional["EntityChain"] = None
+    """Entities that have been found in input text (most recent first)."""
 
     intent_context: Dict[str, Any] = field(default_factory=dict)
     """Context items from outside or acquired during matching."""
@@ -79,10 +151,23 @@ class MatchContext:
     is_start_of_word: bool = True
     """True if current text is the start of a word."""
 
+    @property
+    def text(self) -> str:
+        """Input text remaining to be processed."""
+        return self.full_text[self.offset :]
+
+    @property
+    def entities(self) -> List[MatchEntity]:
+        """Entities that have been found in input text."""
+        if self.entity_chain is None:
+            return []
+
+        return self.entity_chain.to_list()
+
     @property
     def is_match(self) -> bool:
         """True if no text is left that isn't just whitespace or punctuation"""
-        text = PUNCTUATION.sub("", self.text).strip()
+        text = self.full_text[self.offset :].translate(_REMOVE_PUNCTUATION).strip()
         return not text
 
 
@@ -111,6 +196,7 @@ def recognize(
     skip_words: Optional[Iterable[str]] = None,
     intent_context: Optional[Dict[str, Any]] = None,
     default_response: Optional[str] = "default",
+    executor: Optional[Executor] = None,
 ) -> Optional[RecognizeResult]:
     """Return the first match of input text/words against a collection of intents."""
     for result in recognize_all(
@@ -121,6 +207,7 @@ def recognize(
         skip_words=skip_words,
         intent_context=intent_context,
         default_response=default_response,
+        executor=executor,
     ):
         return result
 
@@ -135,19 +222,37 @@ def recognize_all(
     skip_words: Optional[Iterable[str]] = None,
     intent_context: Optional[Dict[str, Any]] = None,
     default_response: Optional[str] = "default",
+    executor: Optional[Executor] = None,
 ) -> Iterable[RecognizeResult]:
-    """Return all matches for input text/words against a collection of intents."""
-    text = normalize_text(text).strip()
-
-    if skip_words is None:
-        skip_words = intents.skip_words
-    else:
-        # Combine skip words
-        skip_words = itertools.chain(skip_words, intents.skip_words)
+    """
+    Return all matches for input text/words against a collection of intents.
+
+    If an executor is given, sentences are matched in parallel with it.
+    Results are still returned in the same order.
+    Only thread pools are supported, since the slot lists and intents are
+    shared with every sentence and would be copied to each task otherwise.
+    """
+    yield from _recognize_all_cleaned(
+        _clean_text(text, intents, skip_words),
+        intents,
+        slot_lists=slot_lists,
+        expansion_rules=expansion_rules,
+        intent_context=intent_context,
+        default_response=default_response,
+        executor=executor,
+    )
 
-    if skip_words:
-        text = _remove_skip_words(text, skip_words)
 
+def _recognize_all_cleaned(
+    text: str,
+    intents: Intents,
+    slot_lists: Optional[Dict[str, SlotList]] = None,
+    expansion_rules: Optional[Dict[str, Sentence]] = None,
+    intent_context: Optional[Dict[str, Any]] = None,
+    default_response: Optional[str] = "default",
+    executor: Optional[Executor] = None,
+) -> Iterable[RecognizeResult]:
+    """Return all matches for text that was already normalized with skip words removed."""
     if intents.settings.ignore_whitespace:
         text = WHITESPACE.sub("", text)
     else:
@@ -178,105 +283,339 @@ def recognize_all(
         ignore_whitespace=intents.settings.ignore_whitespace,
     )
 
-    # Check sentence against each intent.
-    # This should eventually be done in parallel.
-    for intent in intents.intents.values():
-        for intent_data in intent.data:
-            for intent_sentence in intent_data.sentences:
-                # Create initial context
-                match_context = MatchContext(
-                    text=text,
+    # Used to quickly rule out sentences
+    filter_text = remove_punctuation_and_whitespace(text)
+    input_words: Optional[Set[str]] = None
+    if not settings.ignore_whitespace:
+        input_words = set(PUNCTUATION.sub(" ", text).split())
+
+    # Check each sentence whose literal prefix matches the input
+    sentence_args: List[Tuple[Intent, IntentData, Sentence]] = []
+    for intent, intent_data, intent_sentence in intents.find_sentences(filter_text):
+        if (input_words is not None) and (
+            not intent_sentence.required_words.issubset(input_words)
+        ):
+            # Sentence is missing required words
+            continue
+
+        if not intent_sentence.is_possible_match(filter_text):
+            # Sentence can't match
+            continue
+
+        if executor is None:
+            yield from _recognize_sentence(
+                settings,
+                text,
+                intent_context,
+                default_response,
+                intent,
+                intent_data,
+                intent_sentence,
+            )
+        else:
+            sentence_args.append((intent, intent_data, intent_sentence))
+
+    if executor is None:
+        return
+
+    # Match sentences in parallel, but return results in order
+    futures = [
+        executor.submit(
+            _recognize_sentence_all,
+            settings,
+            text,
+            intent_context,
+            default_response,
+            intent,
+            intent_data,
+            intent_sentence,
+        )
+        for intent, intent_data, intent_sentence in sentence_args
+    ]
+
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # Stop early if caller doesn't need more results
+        for future in futures:
+            future.cancel()
+
+
+def _recognize_sentence_all(
+    settings: MatchSettings,
+    text: str,
+    intent_context: Dict[str, Any],
+    default_response: Optional[str],
+    intent: Intent,
+    intent_data: IntentData,
+    intent_sentence: Sentence,
+) -> List[RecognizeResult]:
+    """Return all matches for a single sentence (used with executors)."""
+    return list(
+        _recognize_sentence(
+            settings,
+            text,
+            intent_context,
+            default_response,
+            intent,
+            intent_data,
+            intent_sentence,
+        )
+    )
+
+
+def _recognize_sentence(
+    settings: MatchSettings,
+    text: str,
+    intent_context: Dict[str, Any],
+    default_response: Optional[str],
+    intent: Intent,
+    intent_data: IntentData,
+    intent_sentence: Sentence,
+) -> Iterable[RecognizeResult]:
+    """Yield matches for cleaned input text against a single intent sentence."""
+    maybe_match_contexts: Iterable[MatchContext]
+    literal_text = intent_sentence.literal_text
+    if (
+        (literal_text is not None)
+        and (not settings.ignore_whitespace)
+        and (text == literal_text + " ")
+    ):
+        # Input is exactly the sentence text, which is its only match
+        maybe_match_contexts = [
+            MatchContext(
+                full_text=text,
+                offset=len(text),
+                intent_context=intent_context,
+            )
+        ]
+    else:
+        # Create initial context
+        match_context = MatchContext(
+            full_text=text,
+            intent_context=intent_context,
+        )
+        maybe_match_contexts = match_expression(
+            settings, match_context, intent_sentence
+        )
+
+    for maybe_match_context in maybe_match_contexts:
+        if not maybe_match_context.is_match:
+            continue
+
+        skip_match = False
+
+        # Verify excluded context
+        if intent_data.excludes_context:
+            for (
+                context_key,
+                context_value,
+            ) in intent_data.excludes_context.items():
+                actual_value = maybe_match_context.intent_context.get(context_key)
+                if actual_value == context_value:
+                    # Exact match to context value
+                    skip_match = True
+                    break
+
+                if (
+                    isinstance(context_value, collections.abc.Collection)
+                    and not isinstance(context_value, str)
+                    and (actual_value in context_value)
+                ):
+                    # Actual value was in context value list
+                    skip_match = True
+                    break
+
+        # Verify required context
+        if (not skip_match) and intent_data.requires_context:
+            for (
+                context_key,
+                context_value,
+            ) in intent_data.requires_context.items():
+                actual_value = maybe_match_context.intent_context.get(context_key)
+
+                if actual_value == context_value and context_value is not None:
+                    # Exact match to context value, except when context value is required and not provided
+                    continue
+
+                if context_value is None and actual_value is not None:
+                    # Any value matches, as long as it's set
+                    continue
+
+                if (
+                    isinstance(context_value, collections.abc.Collection)
+                    and not isinstance(context_value, str)
+                    and (actual_value in context_value)
+                ):
+                    # Actual value was in context value list
+                    continue
+
+                # Did not match required context
+                skip_match = True
+                break
+
+        if skip_match:
+            # Intent context did not match
+            continue
+
+        # Add fixed entities
+        entities = maybe_match_context.entities
+        for slot_name, slot_value in intent_data.slots.items():
+            entities.append(MatchEntity(name=slot_name, value=slot_value, text=""))
+
+        # Return each match
+        response = default_response
+        if intent_data.response is not None:
+            response = intent_data.response
+
+        yield RecognizeResult(
+            intent=intent,
+            entities={entity.name: entity for entity in entities},
+            entities_list=entities,
+            response=response,
+        )
+
+
+class RecognizeCache:
+    """
+    Least-recently-used cache of recognition results.
+
+    Results (including misses) are keyed on the normalized input text, the
+    identity of the intents/slot lists/expansion rules, and the intent context.
+    Call cache_clear() whenever the intents or slot lists are modified in place.
+
+    Each caller gets its own copy of a cached result, so results may be
+    modified. Misses are cached as None without the reason they failed.
+    """
+
+    def __init__(self, max_size: int = 128) -> None:
+        self.max_size = max_size
+        self._results: "OrderedDict[Hashable, Tuple[Any, Optional[RecognizeResult]]]"
+        self._results = OrderedDict()
+
+    def recognize(
+        self,
+        text: str,
+        intents: Intents,
+        slot_lists: Optional[Dict[str, SlotList]] = None,
+        expansion_rules: Optional[Dict[str, Sentence]] = None,
+        skip_words: Optional[Iterable[str]] = None,
+        intent_context: Optional[Dict[str, Any]] = None,
+        default_response: Optional[str] = "default",
+        executor: Optional[Executor] = None,
+    ) -> Optional[RecognizeResult]:
+        """
+        Return the first match of input text/words, using a cached result if possible.
+
+        The executor is only used on a miss and is not part of the key.
+        """
+        text = _clean_text(text, intents, skip_words)
+        key = _make_cache_key(
+            text,
+            intents,
+            slot_lists,
+            expansion_rules,
+            intent_context,
+            default_response,
+        )
+
+        if key is not None:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return _copy_result(cached[1])
+
+        # Text is already cleaned, so skip words aren't removed again
+        result = next(
+            iter(
+                _recognize_all_cleaned(
+                    text,
+                    intents,
+                    slot_lists=slot_lists,
+                    expansion_rules=expansion_rules,
                     intent_context=intent_context,
+                    default_response=default_response,
+                    executor=executor,
                 )
-                maybe_match_contexts = match_expression(
-                    settings, match_context, intent_sentence
-                )
-                for maybe_match_context in maybe_match_contexts:
-                    if not maybe_match_context.is_match:
-                        continue
-
-                    skip_match = False
-
-                    # Verify excluded context
-                    if intent_data.excludes_context:
-                        for (
-                            context_key,
-                            context_value,
-                        ) in intent_data.excludes_context.items():
-                            actual_value = maybe_match_context.intent_context.get(
-                                context_key
-                            )
-                            if actual_value == context_value:
-                                # Exact match to context value
-                                skip_match = True
-                                break
-
-                            if (
-                                isinstance(context_value, collections.abc.Collection)
-                                and not isinstance(context_value, str)
-                                and (actual_value in context_value)
-                            ):
-                                # Actual value was in context value list
-                                skip_match = True
-                                break
-
-                    # Verify required context
-                    if (not skip_match) and intent_data.requires_context:
-                        for (
-                            context_key,
-                            context_value,
-                        ) in intent_data.requires_context.items():
-                            actual_value = maybe_match_context.intent_context.get(
-                                context_key
-                            )
-
-                            if (
-                                actual_value == context_value
-                                and context_value is not None
-                            ):
-                                # Exact match to context value, except when context value is required and not provided
-                                continue
-
-                            if context_value is None and actual_value is not None:
-                                # Any value matches, as long as it's set
-                                continue
-
-                            if (
-                                isinstance(context_value, collections.abc.Collection)
-                                and not isinstance(context_value, str)
-                                and (actual_value in context_value)
-                            ):
-                                # Actual value was in context value list
-                                continue
-
-                            # Did not match required context
-                            skip_match = True
-                            break
-
-                    if skip_match:
-                        # Intent context did not match
-                        continue
-
-                    # Add fixed entities
-                    for slot_name, slot_value in intent_data.slots.items():
-                        maybe_match_context.entities.append(
-                            MatchEntity(name=slot_name, value=slot_value, text="")
-                        )
+            ),
+            None,
+        )
 
-                    # Return each match
-                    response = default_response
-                    if intent_data.response is not None:
-                        response = intent_data.response
-
-                    yield RecognizeResult(
-                        intent=intent,
-                        entities={
-                            entity.name: entity
-                            for entity in maybe_match_context.entities
-                        },
-                        entities_list=maybe_match_context.entities,
-                        response=response,
-                    )
+        if key is not None:
+            # Keep referenced objects alive so their ids can't be reused
+            self._results[key] = (
+                (intents, slot_lists, expansion_rules),
+                _copy_result(result),
+            )
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+        return result
+
+    def cache_clear(self) -> None:
+        """Remove all cached results."""
+        self._results.clear()
+
+
+def _copy_result(result: Optional[RecognizeResult]) -> Optional[RecognizeResult]:
+    """Copy a result and its entities (intent and entity values are shared)."""
+    if result is None:
+        return None
+
+    entities_list = [replace(entity) for entity in result.entities_list]
+    return RecognizeResult(
+        intent=result.intent,
+        entities={entity.name: entity for entity in entities_list},
+        entities_list=entities_list,
+        response=result.response,
+    )
+
+
+def _make_cache_key(
+    text: str,
+    intents: Intents,
+    slot_lists: Optional[Dict[str, SlotList]],
+    expansion_rules: Optional[Dict[str, Sentence]],
+    intent_context: Optional[Dict[str, Any]],
+    default_response: Optional[str],
+) -> Optional[Hashable]:
+    """Create a key for RecognizeCache or None if the input can't be hashed."""
+    key = (
+        text,
+        id(intents),
+        frozenset((name, id(slot_list)) for name, slot_list in slot_lists.items())
+        if slot_lists
+        else None,
+        frozenset((name, id(rule)) for name, rule in expansion_rules.items())
+        if expansion_rules
+        else None,
+        _freeze(intent_context) if intent_context else None,
+        default_response,
+    )
+
+    try:
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _freeze(value: Any) -> Any:
+    """
+    Convert dicts/collections into hashable equivalents.
+
+    The type is kept since values of different types may compare differently
+    in context checks (e.g., a list is never equal to a tuple).
+    """
+    if isinstance(value, collections.abc.Mapping):
+        return (type(value), frozenset((k, _freeze(v)) for k, v in value.items()))
+
+    if isinstance(value, collections.abc.Collection) and not isinstance(value, str):
+        return (type(value), tuple(_freeze(v) for v in value))
+
+    return value
 
 
 def is_match(
@@ -293,7 +632,7 @@ def is_match(
     text = normalize_text(text).strip()
 
     if skip_words:
-        text = _remove_skip_words(text, skip_words)
+        text = _remove_skip_words(text, _compile_skip_words(frozenset(skip_words)))
 
     if ignore_whitespace:
         text = WHITESPACE.sub("", text)
@@ -317,7 +656,7 @@ def is_match(
     )
 
     match_context = MatchContext(
-        text=text,
+        full_text=text,
         intent_context=intent_context,
     )
 
@@ -328,14 +667,31 @@ def is_match(
     return None
 
 
-def _remove_skip_words(text: str, skip_words: Iterable[str]) -> str:
-    """Remove skip words from text."""
+def _clean_text(
+    text: str, intents: Intents, skip_words: Optional[Iterable[str]] = None
+) -> str:
+    """Normalize text and remove skip words."""
+    text = normalize_text(text).strip()
+
+    if skip_words is None:
+        # Compiled once per intents
+        skip_words_patterns = intents.skip_words_patterns
+    else:
+        # Combine skip words
+        skip_words_patterns = _compile_skip_words(
+            frozenset(itertools.chain(skip_words, intents.skip_words))
+        )
 
-    # It's critical that skip words are processed longest first, since they may
-    # share prefixes.
-    for skip_word in sorted(skip_words, key=len, reverse=True):
-        skip_word = normalize_text(skip_word)
-        text = re.sub(rf"\b{re.escape(skip_word)}\b", "", text)
+    if skip_words_patterns:
+        text = _remove_skip_words(text, skip_words_patterns)
+
+    return text
+
+
+def _remove_skip_words(text: str, skip_words_patterns: List[Pattern[str]]) -> str:
+    """Remove skip words from text, longest first."""
+    for skip_words_pattern in skip_words_patterns:
+        text = skip_words_pattern.sub("", text)
 
     text = normalize_whitespace(text)
     text = text.strip()
@@ -343,92 +699,257 @@ def _remove_skip_words(text: str, skip_words: Iterable[str]) -> str:
     return text
 
 
+@lru_cache(maxsize=32)
+def _compile_skip_words(skip_words: FrozenSet[str]) -> List[Pattern[str]]:
+    """Compile skip words passed in at recognition time."""
+    return compile_skip_words(skip_words)
+
+
 def match_expression(
     settings: MatchSettings, context: MatchContext, expression: Expression
 ) -> Iterable[MatchContext]:
     """Yield matching contexts for an expression"""
-    if isinstance(expression, TextChunk):
-        chunk: TextChunk = expression
-
-        if settings.ignore_whitespace:
-            # Remove all whitespace
-            chunk_text = WHITESPACE.sub("", chunk.text)
-            context_text = WHITESPACE.sub("", context.text)
+    # Matching is depth first with an explicit stack instead of nested
+    # generators. Each entry is (expression, context, continuation) or
+    # (None, reference contexts iterator, continuation).
+    #
+    # A continuation is (group items, index of next item, outer continuation)
+    # or None when the whole expression has been matched.
+    stack: List[Tuple[Optional[Expression], Any, Optional[_Continuation]]] = [
+        (expression, context, None)
+    ]
+
+    while stack:
+        expression_or_none, context_or_iter, continuation = stack.pop()
+
+        if expression_or_none is None:
+            # Next context from a list/rule reference
+            maybe_context = next(context_or_iter, None)
+            if maybe_context is None:
+                continue
+
+            # Remaining contexts are tried after this one
+            stack.append((None, context_or_iter, continuation))
+            context = maybe_context
         else:
-            # Keep whitespace
-            chunk_text = chunk.text
-            context_text = context.text
+            expression = expression_or_none
+            context = context_or_iter
+
+            expression_kind = _EXPRESSION_KINDS.get(type(expression))
+            if expression_kind is None:
+                expression_kind = _get_expression_kind(expression)
+
+            if expression_kind == _KIND_TEXT:
+                maybe_context = _match_text_chunk(
+                    settings, context, cast(TextChunk, expression)
+                )
+                if maybe_context is None:
+                    continue
+
+                context = maybe_context
+            elif expression_kind == _KIND_SEQUENCE:
+                expression = cast(Sequence, expression)
+                if expression.type == SequenceType.ALTERNATIVE:
+                    # Any may match (words | in | alternative)
+                    # NOTE: [optional] = (optional | )
+                    for item in reversed(expression.items):
+                        stack.append((item, context, continuation))
+
+                    continue
 
-            if context.is_start_of_word:
-                # Ignore extra whitespace at the beginning of chunk and text
-                # since we know we're at the start of a word.
-                chunk_text = chunk_text.lstrip()
-                context_text = context_text.lstrip()
+                if expression.type != SequenceType.GROUP:
+                    raise ValueError(f"Unexpected sequence type: {expression}")
 
-        if chunk.is_empty:
-            # Skip empty chunk
+                if not expression.items:
+                    continue
+
+                # All must match (words in group)
+                continuation = (expression.items, 0, continuation)
+            else:
+                expression = cast(Union[ListReference, RuleReference], expression)
+                stack.append(
+                    (
+                        None,
+                        iter(_match_reference_cached(settings, context, expression)),
+                        continuation,
+                    )
+                )
+                continue
+
+        # Expression was matched
+        if continuation is None:
             yield context
-        elif context_text.startswith(chunk_text):
-            # Successful match for chunk
-            context_text = context_text[len(chunk_text) :]
-            yield MatchContext(
-                text=context_text,
-                # must use chunk.text because it hasn't been stripped
-                is_start_of_word=chunk.text.endswith(" "),
-                # Copy over
-                entities=context.entities,
-                intent_context=context.intent_context,
-            )
-        elif chunk_text.isspace():
-            yield MatchContext(
-                is_start_of_word=True,
-                # Copy over
-                text=context_text,
-                entities=context.entities,
-                intent_context=context.intent_context,
+            continue
+
+        # Match next item in group
+        items, item_index, outer_continuation = continuation
+        next_index = item_index + 1
+        if next_index < len(items):
+            stack.append(
+                (items[item_index], context, (items, next_index, outer_continuation))
             )
         else:
-            # Remove punctuation and try again
-            context_text = PUNCTUATION.sub(" ", context.text).lstrip()
-            if context_text.startswith(chunk_text):
-                context_text = context_text[len(chunk_text) :]
-                yield MatchContext(
-                    text=context_text,
-                    # Copy over
-                    entities=context.entities,
+            stack.append((items[item_index], context, outer_continuation))
+
+
+def _get_expression_kind(expression: Expression) -> int:
+    """Get kind of an expression whose type is a subclass of a known type."""
+    for expression_type, expression_kind in _EXPRESSION_KINDS.items():
+        if isinstance(expression, expression_type):
+            return expression_kind
+
+    raise ValueError(f"Unexpected expression: {expression}")
+
+
+def _match_text_chunk(
+    settings: MatchSettings, context: MatchContext, chunk: TextChunk
+) -> Optional[MatchContext]:
+    """Return the matching context for a chunk of text, or None"""
+    if chunk.is_empty:
+        # Skip empty chunk
+        return context
+
+    # Only possible when whitespace is kept and we're not at the start of a
+    # word. Stripped chunk text is never just whitespace.
+    is_whitespace = False
+
+    if settings.ignore_whitespace:
+        # Remove all whitespace
+        chunk_text = chunk.text_without_whitespace
+        context_text = WHITESPACE.sub("", context.text)
+        context_offset = 0
+    else:
+        # Keep whitespace
+        context_text = context.full_text
+        context_offset = context.offset
+
+        if context.is_start_of_word:
+            # Ignore extra whitespace at the beginning of chunk and text
+            # since we know we're at the start of a word.
+            chunk_text = chunk.stripped_text
+            context_offset = _skip_whitespace(context_text, context_offset)
+        else:
+            chunk_text = chunk.text
+            is_whitespace = chunk.is_whitespace
+
+    if context_text.startswith(chunk_text, context_offset):
+        # Successful match for chunk
+        return MatchContext(
+            full_text=context_text,
+            offset=context_offset + len(chunk_text),
+            # must use chunk.text because it hasn't been stripped
+            is_start_of_word=chunk.ends_with_space,
+            # Copy over
+            entity_chain=context.entity_chain,
+            intent_context=context.intent_context,
+        )
+    if is_whitespace:
+        return MatchContext(
+            is_start_of_word=True,
+            # Copy over
+            full_text=context_text,
+            offset=context_offset,
+            entity_chain=context.entity_chain,
+            intent_context=context.intent_context,
+        )
+    # Remove punctuation and try again
+    context_text, context_offset = _skip_punctuation(settings, context)
+    if context_text.startswith(chunk_text, context_offset):
+        return MatchContext(
+            full_text=context_text,
+            offset=context_offset + len(chunk_text),
+            # Copy over
+            entity_chain=context.entity_chain,
+            intent_context=context.intent_context,
+            is_start_of_word=context.is_start_of_word,
+        )
+
+    return None
+
+
+def _match_reference_cached(
+    settings: MatchSettings,
+    context: MatchContext,
+    expression: Union[ListReference, RuleReference],
+) -> Iterable[MatchContext]:
+    """Yield matching contexts for a list/rule reference, re-using earlier results."""
+    if isinstance(expression, ListReference):
+        reference_key: Tuple[str, ...] = (
+            "list",
+            expression.list_name,
+            expression.slot_name,
+        )
+    else:
+        reference_key = ("rule", expression.rule_name)
+
+    cache_key = (
+        reference_key,
+        context.full_text,
+        context.offset,
+        context.is_start_of_word,
+        tuple(context.intent_context.items()),
+    )
+
+    try:
+        cached_contexts = settings.match_cache.get(cache_key)
+    except TypeError:
+        # Unhashable intent context
+        yield from _match_reference(settings, context, expression)
+        return
+
+    if cached_contexts is None:
+        # Match without entities so results can be re-used from any context
+        cached_contexts = list(
+            _match_reference(
+                settings,
+                MatchContext(
+                    full_text=context.full_text,
+                    offset=context.offset,
                     intent_context=context.intent_context,
                     is_start_of_word=context.is_start_of_word,
-                )
-    elif isinstance(expression, Sequence):
-        seq: Sequence = expression
-        if seq.type == SequenceType.ALTERNATIVE:
-            # Any may match (words | in | alternative)
-            # NOTE: [optional] = (optional | )
-            for item in seq.items:
-                yield from match_expression(settings, context, item)
-
-        elif seq.type == SequenceType.GROUP:
-            if seq.items:
-                # All must match (words in group)
-                group_contexts = [context]
-                for item in seq.items:
-                    # Next step
-                    group_contexts = [
-                        item_context
-                        for group_context in group_contexts
-                        for item_context in match_expression(
-                            settings, group_context, item
-                        )
-                    ]
-                    if not group_contexts:
-                        break
+                ),
+                expression,
+            )
+        )
+        settings.match_cache[cache_key] = cached_contexts
+
+    for cached_context in cached_contexts:
+        yield MatchContext(
+            full_text=cached_context.full_text,
+            offset=cached_context.offset,
+            entity_chain=_rebase_entity_chain(
+                cached_context.entity_chain, context.entity_chain
+            ),
+            intent_context=cached_context.intent_context,
+            is_start_of_word=cached_context.is_start_of_word,
+        )
 
-                for group_context in group_contexts:
-                    yield group_context
-        else:
-            raise ValueError(f"Unexpected sequence type: {seq}")
 
-    elif isinstance(expression, ListReference):
+def _rebase_entity_chain(
+    entity_chain: Optional[EntityChain], base_chain: Optional[EntityChain]
+) -> Optional[EntityChain]:
+    """
+    Put entities from a chain that starts empty on top of another chain.
+
+    Entities are copied, since the same cached chain may end up in several
+    results.
+    """
+    if entity_chain is None:
+        return base_chain
+
+    for entity in entity_chain.to_list():
+        base_chain = EntityChain(replace(entity), base_chain)
+
+    return base_chain
+
+
+def _match_reference(
+    settings: MatchSettings,
+    context: MatchContext,
+    expression: Union[ListReference, RuleReference],
+) -> Iterable[MatchContext]:
+    """Yield matching contexts for a list/rule reference."""
+    if isinstance(expression, ListReference):
         # {list}
         list_ref: ListReference = expression
         if (not settings.slot_lists) or (list_ref.list_name not in settings.slot_lists):
@@ -436,84 +957,84 @@ def match_expression(
 
         slot_list = settings.slot_lists[list_ref.list_name]
         if isinstance(slot_list, TextSlotList):
-            if context.text:
+            if context.offset < len(context.full_text):
                 text_list: TextSlotList = slot_list
                 # Any value may match
-                for slot_value in text_list.values:
-                    value_contexts = match_expression(
-                        settings,
-                        MatchContext(
-                            # Copy over
-                            text=context.text,
-                            entities=context.entities,
-                            intent_context=context.intent_context,
-                            is_start_of_word=context.is_start_of_word,
+                for slot_value, value_context in _match_text_slot_values(
+                    settings, context, text_list
+                ):
+                    # Text consumed by the value. Punctuation may have been
+                    # removed, so the value text can't be sliced directly.
+                    value_text_left = (
+                        len(value_context.full_text) - value_context.offset
+                    )
+                    entity_chain = EntityChain(
+                        MatchEntity(
+                            name=list_ref.slot_name,
+                            value=slot_value.value_out,
+                            text=context.full_text[
+                                context.offset : len(context.full_text)
+                                - value_text_left
+                            ],
                         ),
-                        slot_value.text_in,
+                        context.entity_chain,
                     )
 
-                    for value_context in value_contexts:
-                        entities = context.entities + [
-                            MatchEntity(
-                                name=list_ref.slot_name,
-                                value=slot_value.value_out,
-                                text=context.text[: -len(value_context.text)]
-                                if value_context.text
-                                else context.text,
-                            )
-                        ]
-
-                        if slot_value.context:
-                            # Merge context from matched list value
-                            yield MatchContext(
-                                entities=entities,
-                                intent_context={
-                                    **context.intent_context,
-                                    **slot_value.context,
-                                },
-                                # Copy over
-                                text=value_context.text,
-                                is_start_of_word=context.is_start_of_word,
-                            )
-                        else:
-                            yield MatchContext(
-                                entities=entities,
-                                # Copy over
-                                text=value_context.text,
-                                intent_context=value_context.intent_context,
-                                is_start_of_word=context.is_start_of_word,
-                            )
+                    if slot_value.context:
+                        # Merge context from matched list value
+                        yield MatchContext(
+                            entity_chain=entity_chain,
+                            intent_context={
+                                **context.intent_context,
+                                **slot_value.context,
+                            },
+                            # Copy over
+                            full_text=value_context.full_text,
+                            offset=value_context.offset,
+                            is_start_of_word=context.is_start_of_word,
+                        )
+                    else:
+                        yield MatchContext(
+                            entity_chain=entity_chain,
+                            # Copy over
+                            full_text=value_context.full_text,
+                            offset=value_context.offset,
+                            intent_context=value_context.intent_context,
+                            is_start_of_word=context.is_start_of_word,
+                        )
 
         elif isinstance(slot_list, RangeSlotList):
-            if context.text:
+            if context.offset < len(context.full_text):
                 # List that represents a number range.
                 # Numbers must currently be digits ("1" not "one").
                 range_list: RangeSlotList = slot_list
-                number_match = NUMBER_START.match(context.text)
+                number_match = NUMBER_START.match(context.full_text, context.offset)
                 if number_match is not None:
-                    number_text = number_match[1]
-                    word_number = int(number_text)
-                    if range_list.step == 1:
-                        # Unit step
-                        in_range = range_list.start <= word_number <= range_list.stop
-                    else:
+                    word_number = int(number_match[1])
+                    in_range = range_list.start <= word_number <= range_list.stop
+                    if in_range and (range_list.step != 1):
                         # Non-unit step
-                        in_range = word_number in range(
-                            range_list.start, range_list.stop + 1, range_list.step
-                        )
+                        in_range = (
+                            word_number - range_list.start
+                        ) % range_list.step == 0
 
                     if in_range:
-                        entities = context.entities + [
+                        word_match = FIRST_WORD.match(context.full_text, context.offset)
+                        assert word_match is not None
+
+                        entity_chain = EntityChain(
                             MatchEntity(
                                 name=list_ref.slot_name,
                                 value=word_number,
-                                text=context.text.split()[0],
-                            )
-                        ]
+                                text=word_match[1],
+                            ),
+                            context.entity_chain,
+                        )
 
                         yield MatchContext(
-                            text=context.text[len(number_text) :],
-                            entities=entities,
+                            full_text=context.full_text,
+                            offset=number_match.end(),
+                            entity_chain=entity_chain,
                             # Copy over
                             intent_context=context.intent_context,
                             is_start_of_word=context.is_start_of_word,
@@ -522,7 +1043,7 @@ def match_expression(
         else:
             raise ValueError(f"Unexpected slot list type: {slot_list}")
 
-    elif isinstance(expression, RuleReference):
+    else:
         # <rule>
         rule_ref: RuleReference = expression
         if (not settings.expansion_rules) or (
@@ -533,8 +1054,137 @@ def match_expression(
         yield from match_expression(
             settings, context, settings.expansion_rules[rule_ref.rule_name]
         )
+
+
+def _match_text_slot_values(
+    settings: MatchSettings, context: MatchContext, text_list: TextSlotList
+) -> Iterable[Tuple[TextSlotValue, MatchContext]]:
+    """Yield matching values of a text slot list in list order."""
+    prefix_contexts: Dict[int, MatchContext] = {}
+
+    if settings.ignore_whitespace:
+        # Whitespace is removed from chunks, so the trie can't be used
+        value_indexes: Iterable[int] = range(len(text_list.values))
     else:
-        raise ValueError(f"Unexpected expression: {expression}")
+        # Plain text values are matched by walking a trie once.
+        # This must match the behavior of match_expression for a TextChunk.
+        context_offset = context.offset
+        if context.is_start_of_word:
+            context_offset = _skip_whitespace(context.full_text, context_offset)
+
+        for value_index, end_index in text_list.find_prefixes(
+            context.full_text, context_offset
+        ):
+            prefix_contexts[value_index] = MatchContext(
+                full_text=context.full_text,
+                offset=end_index,
+                entity_chain=context.entity_chain,
+                intent_context=context.intent_context,
+                is_start_of_word=context.is_start_of_word,
+            )
+
+        # Remove punctuation and try again
+        context_text, context_offset = _skip_punctuation(settings, context)
+        for value_index, end_index in text_list.find_prefixes(
+            context_text, context_offset
+        ):
+            if value_index not in prefix_contexts:
+                prefix_contexts[value_index] = MatchContext(
+                    full_text=context_text,
+                    offset=end_index,
+                    entity_chain=context.entity_chain,
+                    intent_context=context.intent_context,
+                    is_start_of_word=context.is_start_of_word,
+                )
+
+        value_indexes = sorted(
+            itertools.chain(prefix_contexts, text_list.template_indexes)
+        )
+
+    for value_index in value_indexes:
+        slot_value = text_list.values[value_index]
+        prefix_context = prefix_contexts.get(value_index)
+        if prefix_context is not None:
+            yield slot_value, prefix_context
+            continue
+
+        for value_context in match_expression(settings, context, slot_value.text_in):
+            yield slot_value, value_context
+
+
+# Expression type -> how it's matched
+_KIND_TEXT = 0
+_KIND_SEQUENCE = 1
+_KIND_REFERENCE = 2
+_EXPRESSION_KINDS: Dict[type, int] = {
+    TextChunk: _KIND_TEXT,
+    Sequence: _KIND_SEQUENCE,
+    Sentence: _KIND_SEQUENCE,
+    ListReference: _KIND_REFERENCE,
+    RuleReference: _KIND_REFERENCE,
+}
+
+
+def _skip_punctuation(
+    settings: MatchSettings, context: MatchContext
+) -> Tuple[str, int]:
+    """
+    Return text with punctuation replaced by spaces and the offset of the
+    first non-whitespace character at or after the context's offset.
+    """
+    text, offset_map = _replace_punctuation(settings, context.full_text)
+    return text, _skip_whitespace(text, offset_map[context.offset])
+
+
+def _replace_punctuation(settings: MatchSettings, text: str) -> Tuple[str, List[int]]:
+    """
+    Replace punctuation in text with spaces, computed once per text.
+
+    Also returns a map from each offset in text to the corresponding offset in
+    the replaced text, so that replaced_text[offset_map[i]:] is the same as
+    replacing punctuation in text[i:].
+    """
+    cached = settings.punctuation_cache.get(text)
+    if cached is not None:
+        return cached
+
+    replaced_parts: List[str] = []
+    offset_map: List[int] = []
+    text_index = 0
+    replaced_len = 0
+    for punctuation_match in PUNCTUATION.finditer(text):
+        text_part = text[text_index : punctuation_match.start()]
+        offset_map.extend(range(replaced_len, replaced_len + len(text_part)))
+        replaced_len += len(text_part)
+
+        # Every character in the punctuation run maps to its single space
+        offset_map.extend(
+            replaced_len
+            for _ in range(punctuation_match.start(), punctuation_match.end())
+        )
+        replaced_len += 1
+
+        replaced_parts.append(text_part)
+        replaced_parts.append(" ")
+        text_index = punctuation_match.end()
+
+    text_part = text[text_index:]
+    offset_map.extend(range(replaced_len, replaced_len + len(text_part) + 1))
+    replaced_parts.append(text_part)
+
+    cached = ("".join(replaced_parts), offset_map)
+    settings.punctuation_cache[text] = cached
+
+    return cached
+
+
+def _skip_whitespace(text: str, offset: int) -> int:
+    """Return the index of the first non-whitespace character at or after offset."""
+    text_len = len(text)
+    while (offset < text_len) and text[offset].isspace():
+        offset += 1
+
+    return offset
 
 
 def _normalize_whitespace(text: str) -> str:
@@ -2,12 +2,16 @@
 import collections
 import re
 import unicodedata
+from typing import Dict, Iterable, List, Pattern
 
 _WHITESPACE_PATTERN = re.compile(r"(\s+)")
 _WHITESPACE_SEPARATOR = " "
 
 _TEMPLATE_SYNTAX = re.compile(r".*[(){}<>\[\]|].*")
 
+PUNCTUATION_CHARS = ".。,，?¿？!！;；:："
+_PUNCTUATION_WHITESPACE_PATTERN = re.compile(rf"[\s{re.escape(PUNCTUATION_CHARS)}]+")
+
 
 def merge_dict(base_dict, new_dict):
     """Merges new_dict into base_dict."""
@@ -52,6 +56,27 @@ def normalize_text(text: str) -> str:
     return text
 
 
+def remove_punctuation_and_whitespace(text: str) -> str:
+    """Remove all punctuation and whitespace from text."""
+    return _PUNCTUATION_WHITESPACE_PATTERN.sub("", text)
+
+
 def is_template(text: str) -> bool:
     """True if text contains template syntax"""
     return _TEMPLATE_SYNTAX.match(text) is not None
+
+
+def compile_skip_words(skip_words: Iterable[str]) -> List[Pattern[str]]:
+    """Compile skip words into one regex alternation per word length."""
+
+    # It's critical that skip words are removed longest first, since they may
+    # share prefixes or overlap. A single alternation would remove the leftmost
+    # word instead of the longest one.
+    words_by_length: Dict[int, Dict[str, None]] = collections.defaultdict(dict)
+    for skip_word in skip_words:
+        words_by_length[len(skip_word)][normalize_text(skip_word)] = None
+
+    return [
+        re.compile(rf"\b(?:{'|'.join(re.escape(skip_word) for skip_word in words)})\b")
+        for _length, words in sorted(words_by_length.items(), reverse=True)
+    ]
@@ -96,6 +96,100 @@ def test_sentence_alternative_whitespace():
     )
 
 
+def test_names_interned():
+    sentence_1 = parse_sentence("turn on {name:entity} in <area>")
+    sentence_2 = parse_sentence("turn on <area> {name:entity}")
+
+    assert sentence_1.items[0].text is sentence_2.items[0].text
+    assert sentence_1.items[2].list_name is sentence_2.items[4].list_name
+    assert sentence_1.items[2].slot_name is sentence_2.items[4].slot_name
+    assert sentence_1.items[4].rule_name is sentence_2.items[2].rule_name
+
+
+def test_sentence_filter_pattern():
+    pattern = parse_sentence("turn on [the] light[s], <area>").filter_pattern
+    assert pattern is not None
+    assert pattern.pattern == "turnon(?:the|)light(?:s|).*?"
+    assert pattern.fullmatch("turnonthelightskitchen")
+    assert not pattern.fullmatch("turnofflights")
+
+    # Sentences that may match anything have no filter
+    assert parse_sentence("<name>").filter_pattern is None
+    assert parse_sentence("(<name> | {area})").filter_pattern is None
+
+
+def test_sentence_filter_segments():
+    # Two wildcards still use a regex
+    sentence = parse_sentence("turn on {name} in, the {area} [now]")
+    assert sentence.filter_pattern is not None
+    assert sentence.filter_segments is None
+
+    # More wildcards could make the regex backtrack heavily
+    sentence = parse_sentence("turn on {name} in the <area> at {time} now")
+    assert sentence.filter_pattern is None
+    assert sentence.filter_segments == ["turnon", "inthe", "at", "now"]
+    assert sentence.is_possible_match("turnonlampinthekitchenatnoonnow")
+    assert sentence.is_possible_match("turnoninthe7atnow")
+    assert not sentence.is_possible_match("turnonlampinkitchenatnoonnow")
+    assert not sentence.is_possible_match("turnonnow")
+
+    # Alternatives with different text may match anything
+    sentence = parse_sentence("[please] turn on {name} in the {area} at {time}")
+    assert sentence.filter_pattern is None
+    assert sentence.filter_segments == ["", "turnon", "inthe", "at", ""]
+    assert sentence.is_possible_match("pleaseturnonlampinthekitchenat7")
+    assert not sentence.is_possible_match("pleaseturnofflampinthekitchenat7")
+
+    assert (
+        parse_sentence("[the] {name} [in] {area} [at] {time}").filter_segments is None
+    )
+
+
+def test_sentence_required_words():
+    assert parse_sentence("turn on the lights").required_words == {
+        "turn",
+        "on",
+        "the",
+        "lights",
+    }
+
+    # Optionals, alternatives, lists, and rules don't contribute words
+    assert parse_sentence(
+        "[please] turn on the light[s] in (the|my) <area>"
+    ).required_words == {"on", "the"}
+
+    # Words that may be glued to a list value in the input are left out
+    assert parse_sentence("turn on {area} lights").required_words == {"turn", "on"}
+
+
+def test_sentence_literal_text():
+    assert parse_sentence("(turn on the lights)").literal_text == "turn on the lights"
+
+    assert parse_sentence("turn on [the] lights").literal_text is None
+    assert parse_sentence("turn on {name}").literal_text is None
+    assert parse_sentence("turn on <name>").literal_text is None
+
+
+def test_sentence_literal_prefix():
+    assert parse_sentence("turn on, the {name}").literal_prefix == "turnonthe"
+    assert parse_sentence("((turn on) light[s])").literal_prefix == "turnonlight"
+    assert parse_sentence("(turn|switch) on").literal_prefix == ""
+
+
+def test_text_chunk_precomputed():
+    chunk = TextChunk(" living  room ")
+    assert chunk.stripped_text == "living  room "
+    assert chunk.text_without_whitespace == "livingroom"
+    assert chunk.ends_with_space
+    assert not chunk.is_whitespace
+
+    assert TextChunk(" ").is_whitespace
+    assert TextChunk.empty().is_empty
+
+    # Derived fields don't take part in equality
+    assert TextChunk("test") == t(text="test")
+
+
 # -----------------------------------------------------------------------------
 
 
@@ -1,5 +1,6 @@
 from hassil import is_match, parse_sentence
-from hassil.intents import TextSlotList
+from hassil.expression import TextChunk
+from hassil.intents import RangeSlotList, TextSlotList
 
 
 def test_no_match():
@@ -59,6 +60,22 @@ def test_list():
     assert is_match("turn off living room", sentence, slot_lists={"area": areas})
 
 
+def test_range_step():
+    sentence = parse_sentence("set to {temp} degrees")
+    temps = RangeSlotList(start=15, stop=25, step=5)
+    for temp in (15, 20, 25):
+        match_context = is_match(
+            f"set to {temp} degrees", sentence, slot_lists={"temp": temps}
+        )
+        assert match_context is not None
+        assert match_context.entities[0].value == temp
+
+    for temp in (10, 16, 30):
+        assert not is_match(
+            f"set to {temp} degrees", sentence, slot_lists={"temp": temps}
+        )
+
+
 def test_list_prefix_suffix():
     sentence = parse_sentence("turn off abc-{area}-123")
     areas = TextSlotList.from_strings(["kitchen", "living room"])
@@ -110,3 +127,66 @@ def test_no_allow_template():
 def test_no_whitespace_fails():
     sentence = parse_sentence("this is a test")
     assert not is_match("thisisatest", sentence)
+
+
+def test_list_shared_prefix():
+    sentence = parse_sentence("turn on {name} [light]")
+    names = TextSlotList.from_tuples(
+        [("living room", "living_room"), ("living", "living"), ("(den|office)", "den")]
+    )
+
+    match_context = is_match(
+        "turn on living room light", sentence, slot_lists={"name": names}
+    )
+    assert match_context is not None
+    assert match_context.entities[0].value == "living_room"
+
+    match_context = is_match(
+        "turn on living light", sentence, slot_lists={"name": names}
+    )
+    assert match_context is not None
+    assert match_context.entities[0].value == "living"
+
+    match_context = is_match("turn on office", sentence, slot_lists={"name": names})
+    assert match_context is not None
+    assert match_context.entities[0].value == "den"
+
+
+def test_list_find_prefixes():
+    names = TextSlotList.from_strings(["living room", "living", "(den|office)"])
+    assert names.find_prefixes("living room light") == [(1, 6), (0, 11)]
+    assert names.find_prefixes("the living room", 4) == [(1, 10), (0, 15)]
+    assert names.template_indexes == [2]
+
+    # Trie is rebuilt when values change
+    names.values.append(TextSlotList.from_strings(["liv"]).values[0])
+    assert names.find_prefixes("living") == [(3, 3), (1, 6)]
+
+
+def test_list_value_replaced():
+    sentence = parse_sentence("turn on {name}")
+    names = TextSlotList.from_strings(["lamp", "tv"])
+    assert is_match("turn on lamp", sentence, slot_lists={"name": names})
+
+    # Same length, but a different value
+    names.values[0] = TextSlotList.from_strings(["fan"]).values[0]
+
+    match_context = is_match("turn on fan", sentence, slot_lists={"name": names})
+    assert match_context is not None
+    assert match_context.entities[0].value == "fan"
+    assert match_context.entities[0].text == "fan"
+    assert not is_match("turn on lamp", sentence, slot_lists={"name": names})
+
+    # Values modified in place need an explicit invalidate
+    names.values[1].text_in = TextChunk("radio")
+    names.invalidate()
+    assert is_match("turn on radio", sentence, slot_lists={"name": names})
+    assert not is_match("turn on tv", sentence, slot_lists={"name": names})
+
+
+def test_long_sentence():
+    # Items are matched without recursion, so length isn't limited by the stack
+    text = " ".join(["word"] * 3000)
+    sentence = parse_sentence(text)
+    assert is_match(text, sentence)
+    assert not is_match(text + " word", sentence)
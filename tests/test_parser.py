@@ -81,3 +81,20 @@ def test_rule_escape():
         start_index=0,
         end_index=len(text),
     )
+
+
+def test_start_index():
+    text = "test (test2 | test3) {test4}"
+    assert next_chunk(text, 5) == ParseChunk(
+        text="(test2 | test3)",
+        parse_type=ParseType.GROUP,
+        start_index=5,
+        end_index=20,
+    )
+    assert next_chunk(text, 21) == ParseChunk(
+        text="{test4}",
+        parse_type=ParseType.LIST,
+        start_index=21,
+        end_index=len(text),
+    )
+    assert next_chunk(text, len(text)) is None
@@ -1,11 +1,14 @@
 import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import cast
 
 import pytest
 
-from hassil import Intents, recognize, recognize_all
+from hassil import Intents, RecognizeCache, recognize, recognize_all
 from hassil.expression import TextChunk
-from hassil.intents import TextSlotList
+from hassil.intents import Intent, IntentData, TextSlotList
+from hassil.parse_expression import parse_sentence
 
 TEST_YAML = """
 language: "en"
@@ -334,6 +337,62 @@ def test_skip_sorted() -> None:
     assert result.entities["test_name"].value == "test"
 
 
+def test_skip_words_pattern_cached() -> None:
+    """Ensure skip words are compiled once and recompiled when they change"""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent:
+        data:
+          - sentences:
+              - "run test"
+    skip_words:
+      - "could you"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    assert recognize("could you run test", intents) is not None
+
+    # Patterns are compiled once and re-used
+    skip_words_patterns = intents.skip_words_patterns
+    assert skip_words_patterns
+    assert intents.skip_words_patterns is skip_words_patterns
+
+    # Patterns are recompiled when skip words change
+    assert recognize("please run test", intents) is None
+    intents.skip_words.append("please")
+    assert intents.skip_words_patterns is not skip_words_patterns
+    assert recognize("please run test", intents) is not None
+
+
+def test_skip_overlapping() -> None:
+    """Ensure the longest skip word is removed when skip words overlap"""
+    yaml_text = """
+    language: "en"
+    intents:
+      A:
+        data:
+          - sentences:
+              - "a"
+      B:
+        data:
+          - sentences:
+              - "c d"
+    skip_words:
+      - "b c d"
+      - "a b"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    result = recognize("a b c d", intents)
+    assert result is not None
+    assert result.intent.name == "A"
+
+
 def test_response_key() -> None:
     """Check response key in intent data"""
     yaml_text = """
@@ -453,3 +512,355 @@ def test_ignore_whitespace() -> None:
     for sentence in ("runtest", "runthetest", "r u n t h e t e s t"):
         result = recognize(sentence, intents)
         assert result is not None, sentence
+
+
+# pylint: disable=redefined-outer-name,protected-access
+def test_recognize_cache(intents, slot_lists, monkeypatch):
+    """Test caching of recognition results."""
+    cache = RecognizeCache(max_size=2)
+
+    # Count calls that weren't cached
+    recognize_module = sys.modules[RecognizeCache.__module__]
+    recognize_all_cleaned = recognize_module._recognize_all_cleaned
+    clean_text = recognize_module._clean_text
+    recognize_texts = []
+    clean_texts = []
+
+    def counting_recognize_all_cleaned(text, *args, **kwargs):
+        recognize_texts.append(text)
+        return recognize_all_cleaned(text, *args, **kwargs)
+
+    def counting_clean_text(text, *args, **kwargs):
+        clean_texts.append(text)
+        return clean_text(text, *args, **kwargs)
+
+    monkeypatch.setattr(
+        recognize_module, "_recognize_all_cleaned", counting_recognize_all_cleaned
+    )
+    monkeypatch.setattr(recognize_module, "_clean_text", counting_clean_text)
+
+    result = cache.recognize("turn on kitchen TV", intents, slot_lists=slot_lists)
+    assert result is not None
+    assert result.intent.name == "TurnOnTV"
+    assert len(recognize_texts) == 1
+
+    # Text is only cleaned once on a miss
+    assert clean_texts == ["turn on kitchen TV"]
+
+    # Same normalized text and skip words removed
+    assert (
+        cache.recognize("Turn on  kitchen TV please", intents, slot_lists=slot_lists)
+        == result
+    )
+    assert len(recognize_texts) == 1
+
+    # Misses are cached too
+    assert cache.recognize("close the hue", intents, slot_lists=slot_lists) is None
+    assert cache.recognize("close the hue", intents, slot_lists=slot_lists) is None
+    assert len(recognize_texts) == 2
+
+    # Different slot lists are a different key
+    other_slot_lists = {
+        **slot_lists,
+        "area": TextSlotList.from_strings(["living room"]),
+    }
+    assert (
+        cache.recognize("turn on kitchen TV", intents, slot_lists=other_slot_lists)
+        is None
+    )
+    assert len(recognize_texts) == 3
+
+    # Least recently used result was evicted
+    assert (
+        cache.recognize("turn on kitchen TV", intents, slot_lists=slot_lists) == result
+    )
+    assert len(recognize_texts) == 4
+
+    cache.cache_clear()
+    assert (
+        cache.recognize("turn on kitchen TV", intents, slot_lists=slot_lists) == result
+    )
+    assert len(recognize_texts) == 5
+
+
+# pylint: disable=redefined-outer-name
+def test_recognize_cache_executor(intents, slot_lists):
+    """Test caching of recognition results matched with an executor."""
+    cache = RecognizeCache()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = cache.recognize(
+            "turn on kitchen TV", intents, slot_lists=slot_lists, executor=executor
+        )
+        assert result is not None
+        assert result.intent.name == "TurnOnTV"
+
+    # Executor is not part of the key
+    assert cache.recognize("turn on kitchen TV", intents, slot_lists=slot_lists) == (
+        result
+    )
+
+
+# pylint: disable=redefined-outer-name
+def test_recognize_cache_copies(intents, slot_lists):
+    """Test that cached results can't be modified by callers."""
+    cache = RecognizeCache()
+
+    result = cache.recognize("turn on kitchen TV", intents, slot_lists=slot_lists)
+    assert result is not None
+    result.entities["area"].value = "area.garage"
+    result.entities_list.clear()
+
+    cached_result = cache.recognize(
+        "turn on kitchen TV", intents, slot_lists=slot_lists
+    )
+    assert cached_result is not None
+    assert cached_result is not result
+    assert cached_result.intent is result.intent
+    assert cached_result.entities["area"].value == "area.kitchen"
+    assert len(cached_result.entities_list) == len(cached_result.entities)
+
+
+def test_recognize_cache_context_types() -> None:
+    """Test that context values of different types aren't the same key."""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent:
+        data:
+          - sentences:
+              - "run test"
+            requires_context:
+              area:
+                - "kitchen"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    cache = RecognizeCache()
+
+    # Equal to the required list
+    assert (
+        cache.recognize("run test", intents, intent_context={"area": ["kitchen"]})
+        is not None
+    )
+
+    # Not equal to (or in) the required list
+    assert (
+        cache.recognize("run test", intents, intent_context={"area": ("kitchen",)})
+        is None
+    )
+
+
+def test_skip_words_shared_prefix() -> None:
+    """Ensure skip words sharing a prefix are removed in a single pass"""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent:
+        data:
+          - sentences:
+              - "run {test_name}"
+    lists:
+      test_name:
+        values:
+          - "test"
+    skip_words:
+      - "could"
+      - "could you"
+      - "you"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    for sentence in ("could you run test", "you could run test", "run test"):
+        result = recognize(sentence, intents)
+        assert result is not None, sentence
+        assert result.entities["test_name"].value == "test"
+
+
+def test_reference_results_reused() -> None:
+    """Ensure list/rule results shared between sentences keep their own entities"""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent1:
+        data:
+          - sentences:
+              - "{first} to <name>"
+      TestIntent2:
+        data:
+          - sentences:
+              - "{second} to <name>"
+    expansion_rules:
+      name: "[the] {name}"
+    lists:
+      first:
+        values:
+          - in: "go"
+            out: 1
+      second:
+        values:
+          - in: "go"
+            out: 2
+      name:
+        values:
+          - "test"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    results = list(recognize_all("go to the test", intents))
+    assert len(results) == 2
+
+    assert results[0].intent.name == "TestIntent1"
+    assert [entity.name for entity in results[0].entities_list] == ["first", "name"]
+    assert results[0].entities["first"].value == 1
+
+    assert results[1].intent.name == "TestIntent2"
+    assert [entity.name for entity in results[1].entities_list] == ["second", "name"]
+    assert results[1].entities["second"].value == 2
+
+    # Entities from the shared rule are not shared between results
+    assert results[0].entities["name"] is not results[1].entities["name"]
+    results[0].entities["name"].value = "changed"
+    assert results[1].entities["name"].value == "test"
+
+
+def test_recognize_all_fixed_slots() -> None:
+    """Ensure fixed slots are added once to each match of the same sentence."""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent:
+        data:
+          - sentences:
+              - "run [test] [test]"
+            slots:
+              domain: "test"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    results = list(recognize_all("run test", intents))
+    assert len(results) == 2
+    for result in results:
+        assert [entity.name for entity in result.entities_list] == ["domain"]
+
+
+# pylint: disable=redefined-outer-name
+def test_recognize_all_executor(intents, slot_lists):
+    """Test matching sentences in parallel with a thread pool."""
+    for text in ("turn on kitchen TV", "set the brightness in the living room to 75%"):
+        expected = [
+            (result.intent.name, result.entities_list)
+            for result in recognize_all(text, intents, slot_lists=slot_lists)
+        ]
+        assert expected, text
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            actual = [
+                (result.intent.name, result.entities_list)
+                for result in recognize_all(
+                    text, intents, slot_lists=slot_lists, executor=executor
+                )
+            ]
+
+            # Results are in the same order
+            assert actual == expected, text
+
+            result = recognize(text, intents, slot_lists=slot_lists, executor=executor)
+            assert result is not None
+            assert result.intent.name == expected[0][0]
+
+            # Intents are shared with the threads, not copied
+            assert result.intent is intents.intents[result.intent.name]
+
+
+def test_sentence_prefix_trie() -> None:
+    """Test skipping sentences by literal prefix."""
+    yaml_text = """
+    language: "en"
+    intents:
+      TurnOn:
+        data:
+          - sentences:
+              - "turn on {name}"
+              - "(turn|switch) on {name}"
+      TurnOff:
+        data:
+          - sentences:
+              - "turn off {name}"
+    lists:
+      name:
+        values:
+          - "light"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    turn_on, turn_or_switch_on = intents.intents["TurnOn"].data[0].sentences
+    turn_off = intents.intents["TurnOff"].data[0].sentences[0]
+    assert [s for _i, _d, s in intents.find_sentences("turnonlight")] == [
+        turn_on,
+        turn_or_switch_on,
+    ]
+    assert [s for _i, _d, s in intents.find_sentences("switchonlight")] == [
+        turn_or_switch_on
+    ]
+
+    # Trie is rebuilt when sentences change
+    intents.intents["TurnOff"].data[0].sentences.append(parse_sentence("turn {name}"))
+    assert [s for _i, _d, s in intents.find_sentences("turnonlight")] == [
+        turn_on,
+        turn_or_switch_on,
+        intents.intents["TurnOff"].data[0].sentences[1],
+    ]
+    assert turn_off not in [s for _i, _d, s in intents.find_sentences("turnon")]
+
+    # ...and when intents are replaced
+    intents.intents["TurnOff"] = Intent(
+        name="TurnOff", data=[IntentData(sentence_texts=["turn off {name}"])]
+    )
+    assert [i.name for i, _d, _s in intents.find_sentences("turnofflight")] == [
+        "TurnOn",
+        "TurnOff",
+    ]
+    assert intents.find_sentences("turnofflight")[1][0] is intents.intents["TurnOff"]
+
+    results = list(recognize_all("turn on light", intents))
+    assert [result.intent.name for result in results] == ["TurnOn", "TurnOn"]
+    assert recognize("turn off the light", intents) is None
+    assert recognize("turn off light", intents) is not None
+
+
+def test_filter_no_backtracking() -> None:
+    """Ensure sentences with many lists are ruled out without a regex."""
+    yaml_text = """
+    language: "en"
+    intents:
+      TestIntent:
+        data:
+          - sentences:
+              - "{n} the {n} the {n} the {n} the {n} the {n} end"
+    lists:
+      n:
+        values:
+          - "x"
+    """
+
+    with io.StringIO(yaml_text) as test_file:
+        intents = Intents.from_yaml(test_file)
+
+    # A regex would take many seconds to backtrack on input that can't match
+    sentence = intents.intents["TestIntent"].data[0].sentences[0]
+    assert sentence.filter_pattern is None
+    assert sentence.filter_segments == ["", "the", "the", "the", "the", "the", "end"]
+    assert not sentence.is_possible_match("the" * 80 + "stop")
+
+    assert list(recognize_all("x the x the x the x the x the x end", intents))
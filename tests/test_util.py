@@ -4,6 +4,7 @@ from hassil.util import (
     normalize_text,
     normalize_whitespace,
     remove_escapes,
+    remove_punctuation_and_whitespace,
 )
 
 
@@ -25,6 +26,10 @@ def test_normalize_text():
     assert normalize_text("tHIS    is A      Test") == "this is a test"
 
 
+def test_remove_punctuation_and_whitespace():
+    assert remove_punctuation_and_whitespace(" this, is a test?! ") == "thisisatest"
+
+
 def test_is_template():
     assert not is_template("just some plain text")
     assert is_template("[optional] word")